@@ -0,0 +1,79 @@
+import os
+import json
+import argparse
+import time
+import scraper
+
+# Recorded raw feed bytes live here, one file per feed (see --record)
+FIXTURES_DIR = 'fixtures'
+WORKER_COUNTS = [1, 2, 4, 8]
+
+def fixture_path(site_name, category):
+    safe = "".join(c if c.isalnum() else "_" for c in f"{site_name}_{category}")
+    return os.path.join(FIXTURES_DIR, f"{safe}.xml")
+
+def record(feeds):
+    """Downloads every feed once and stores the raw bytes for repeatable benchmarks."""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    contents = scraper.fetch_all(feeds)
+    saved = 0
+    for (site_name, category, _, _), content in zip(feeds, contents):
+        if content is None:
+            continue
+        with open(fixture_path(site_name, category), 'wb') as f:
+            f.write(content)
+        saved += 1
+    print(f"Recorded {saved}/{len(feeds)} feeds to '{FIXTURES_DIR}/'")
+
+def load_fixtures(feeds):
+    contents = []
+    for site_name, category, _, _ in feeds:
+        path = fixture_path(site_name, category)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                contents.append(f.read())
+        else:
+            contents.append(None)
+    return contents
+
+def run_benchmark(feeds, repeat=1):
+    """Times in-process parsing against the process pool at 1/2/4/8 workers."""
+    contents = load_fixtures(feeds) * repeat
+    feeds = feeds * repeat
+    n_feeds = sum(1 for c in contents if c is not None)
+    if not n_feeds:
+        print(f"No fixtures found in '{FIXTURES_DIR}/'. Run with --record first.")
+        return
+
+    cutoff_ts = 0  # keep every item so runs are comparable regardless of fixture age
+    start = time.perf_counter()
+    baseline_count = 0
+    for content, feed in zip(contents, feeds):
+        if content is not None:
+            baseline_count += len(scraper.parse_feed_content(content, feed[3], cutoff_ts)[0])
+    baseline = time.perf_counter() - start
+    print(f"Parsing {n_feeds} feeds ({baseline_count} items), {os.cpu_count()} CPUs available")
+    print(f"  in-process : {baseline:6.2f}s")
+
+    for workers in WORKER_COUNTS:
+        start = time.perf_counter()
+        results = scraper.parse_contents_parallel(contents, feeds, workers, cutoff_ts)
+        duration = time.perf_counter() - start
+        count = sum(len(r) for r in results)
+        print(f"  {workers} worker(s): {duration:6.2f}s  ({baseline / duration:.2f}x, {count} items)")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark feed parsing across worker counts.")
+    arg_parser.add_argument("--record", action="store_true", help="download every feed into fixtures/ and exit")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="parse the fixture set this many times per run")
+    args = arg_parser.parse_args()
+    if args.repeat < 1:
+        arg_parser.error("--repeat must be at least 1")
+
+    with open(scraper.SOURCES_FILE, 'r') as f:
+        feeds = scraper.list_feeds(json.load(f))
+
+    if args.record:
+        record(feeds)
+    else:
+        run_benchmark(feeds, args.repeat)
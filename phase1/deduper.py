@@ -3,6 +3,8 @@ import json
 import anthropic
 import re
 from dotenv import load_dotenv, find_dotenv
+import metrics
+import history
 
 load_dotenv(find_dotenv())
 api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -46,6 +48,7 @@ def deduplicate_feed():
     
     articles = data.get("articles", [])
     initial_count = len(articles)
+    metrics.incr("articles_in", initial_count, stage="dedup")
     
     if initial_count == 0:
         print("No articles to deduplicate.")
@@ -63,19 +66,24 @@ def deduplicate_feed():
 
     print(f"Sending {initial_count} articles to AI to find semantic duplicates...")
     
+    # Whatever ends up in the master feed is remembered for tomorrow's run
+    published = articles
     try:
-        message = client.messages.create(
-            model="claude-haiku-4-5-20251001", # Your model
-            max_tokens=4000,
-            temperature=0,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"### ARTICLES LIST\n{json.dumps(ai_payload, indent=2)}" 
-                }
-            ]
-        )
+        with metrics.span("batch", "dedup", size=initial_count):
+            message = client.messages.create(
+                model="claude-haiku-4-5-20251001", # Your model
+                max_tokens=4000,
+                temperature=0,
+                system=SYSTEM_PROMPT,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": f"### ARTICLES LIST\n{json.dumps(ai_payload, indent=2)}" 
+                    }
+                ]
+            )
+        
+        metrics.record_usage(message, stage="dedup")
         
         # Parse Response
         response_text = message.content[0].text
@@ -86,6 +94,7 @@ def deduplicate_feed():
         ids_to_remove = set(response_data.get("remove_ids", []))
         
         if not ids_to_remove:
+            metrics.incr("articles_out", initial_count, stage="dedup")
             print("No duplicates found. File remains unchanged.")
             return
 
@@ -93,6 +102,9 @@ def deduplicate_feed():
 
         # Filter the original list
         final_articles = [art for art in articles if art["id"] not in ids_to_remove]
+        metrics.incr("drops", initial_count - len(final_articles), stage="dedup", reason="duplicate")
+        metrics.incr("articles_out", len(final_articles), stage="dedup")
+        published = final_articles
 
         # Overwrite the Master File
         with open(TARGET_FILE, 'w', encoding='utf-8') as f:
@@ -101,8 +113,13 @@ def deduplicate_feed():
         print(f"Success! Feed reduced from {initial_count} to {len(final_articles)} articles.")
         print(f"Cleaned data saved to '{TARGET_FILE}'")
 
+    except json.JSONDecodeError as e:
+        metrics.incr("parse_failures", stage="dedup", field="response")
+        print(f"Error during deduplication: {e}")
     except Exception as e:
         print(f"Error during deduplication: {e}")
+    finally:
+        history.record_published(published)
 
 if __name__ == "__main__":
     deduplicate_feed()
\ No newline at end of file
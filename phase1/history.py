@@ -0,0 +1,313 @@
+import os
+import re
+import json
+import hashlib
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from ranker import headline_tokens
+from scraper import OUTPUT_FILE as RAW_FEED_FILE
+import metrics
+
+# --- CONFIG ---
+# Stories published in the last HISTORY_DAYS days are remembered. In a new scrape,
+# exact repeats (same link or near-identical raw text) are dropped before the tagger;
+# articles that only look similar are forwarded with a `possible_repeat_of` hint.
+INDEX_FILE = 'story_index.json'
+HISTORY_DAYS = int(os.getenv("DEDUP_HISTORY_DAYS", "3"))
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4                # 4 x 16-bit bands: any pair within 3 bits shares a band
+MAX_HAMMING = 3                  # signatures this close are the same story
+MIN_SHARED_TOKENS = 3            # possible repeat: tokens two headlines must share
+MIN_JACCARD = 0.5                # ...their overlap relative to the union
+RARE_TOKEN_DF = 3                # ...and, for Title Case headlines, one shared token this rare
+COMMON_TOKEN_LIMIT = 200         # tokens in more headlines than this are not indexed for lookup
+TITLE_CASE_RATIO = 0.8           # share of capitalised words above which casing says nothing
+
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9&'-]*")
+
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+
+
+def simhash(headline, summary):
+    """
+    64-bit SimHash over headline + summary tokens (headline tokens count double).
+    Returns None when there are no usable tokens (e.g. "N/A" or "Up 5%"), since an
+    all-zero signature would otherwise sit within a few bits of every other empty one.
+    """
+    weights = Counter()
+    for token in headline_tokens(headline):
+        weights[token] += 2
+    for token in headline_tokens(summary):
+        weights[token] += 1
+    if not weights:
+        return None
+
+    totals = [0] * SIMHASH_BITS
+    for token, weight in weights.items():
+        h = _token_hash(token)
+        for bit in range(SIMHASH_BITS):
+            totals[bit] += weight if (h >> bit) & 1 else -weight
+
+    signature = 0
+    for bit, total in enumerate(totals):
+        if total > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def headline_entities(headline):
+    """
+    Capitalised headline words as lowercase tokens, a cheap stand-in for named entities.
+    Returns None for Title Case headlines, where capitalisation carries no signal.
+    """
+    words = [w for w in WORD_PATTERN.findall(headline or "") if len(w) > 2]
+    capitalised = [w for w in words if w[0].isupper()]
+    if len(words) >= 4 and len(capitalised) >= TITLE_CASE_RATIO * len(words):
+        return None
+    return headline_tokens(" ".join(capitalised))
+
+
+def _bands(signature):
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [(b, (signature >> (b * width)) & mask) for b in range(SIMHASH_BANDS)]
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class StoryIndex:
+    """
+    Rolling index of recently published stories.
+    Lookups go through banded SimHash buckets and a headline-token inverted index,
+    so checking an article only touches the few stories that could plausibly match.
+    """
+
+    def __init__(self, path=INDEX_FILE, days=HISTORY_DAYS):
+        self.path = path
+        self.days = days
+        self._reset()
+
+    def _reset(self):
+        self.stories = []
+        self.links = defaultdict(list)
+        self.band_index = defaultdict(list)
+        self.token_index = defaultdict(list)
+
+    def load(self):
+        """
+        Reads the index from disk, dropping stories older than the window.
+        The index only saves work, so an unreadable or malformed file is reported
+        and treated as empty rather than stopping the pipeline.
+        """
+        if not os.path.exists(self.path):
+            return self
+
+        oldest = (datetime.now(timezone.utc) - timedelta(days=self.days)).strftime("%Y-%m-%d")
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stories = json.load(f)["stories"]
+            for story in stories:
+                if story["day"] >= oldest:
+                    self._add(story)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Warning: could not read {self.path} ({e}). Starting with an empty story history.")
+            self._reset()
+        return self
+
+    def save(self):
+        """Writes to a temp file and swaps it in, so an interrupted run can't truncate the index."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"stories": self.stories}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _add(self, story):
+        i = len(self.stories)
+        self.stories.append(story)
+        if story.get("link") not in (None, "N/A"):
+            self.links[story["link"]].append(i)
+        if story["simhash"] is not None:
+            for band in _bands(story["simhash"]):
+                self.band_index[band].append(i)
+        for token in story["tokens"]:
+            self.token_index[token].append(i)
+
+    def find_match(self, article, before_day=None):
+        """
+        Returns the stored story this article repeats (same link or SimHash within
+        MAX_HAMMING bits), or None. Only stories recorded before `before_day` count,
+        so re-running today's pipeline does not filter out today's own stories.
+        """
+        before_day = before_day or _today()
+
+        for i in self.links.get(article.get("link"), ()):
+            if self.stories[i]["day"] < before_day:
+                return self.stories[i]
+
+        signature = simhash(article.get("headline"), article.get("summary"))
+        if signature is not None:
+            for band in _bands(signature):
+                for i in self.band_index.get(band, ()):
+                    if self.stories[i]["day"] < before_day and bin(signature ^ self.stories[i]["simhash"]).count("1") <= MAX_HAMMING:
+                        return self.stories[i]
+
+        return None
+
+    def _entities_agree(self, entities, tokens, story):
+        stored_tokens = set(story["tokens"])
+        stored_entities = story.get("entities")
+        if entities is None or stored_entities is None:
+            # No casing signal on one side: require a shared token that is rare in the index
+            return any(len(self.token_index[t]) <= RARE_TOKEN_DF for t in tokens & stored_tokens)
+        return bool(entities & stored_tokens) and bool(set(stored_entities) & tokens)
+
+    def find_possible_repeat(self, article, before_day=None):
+        """
+        Returns a stored story whose headline overlaps this one closely and names the
+        same entities, or None. This is only a hint: a follow-up ("CEO resigns after
+        earnings miss") looks like this too, so callers must not drop on it.
+        """
+        before_day = before_day or _today()
+
+        def eligible(i):
+            return self.stories[i]["day"] < before_day
+
+        tokens = headline_tokens(article.get("headline"))
+        entities = headline_entities(article.get("headline"))
+        shared = Counter()
+        for token in tokens:
+            postings = self.token_index.get(token, ())
+            if len(postings) <= COMMON_TOKEN_LIMIT:
+                shared.update(postings)
+        for i, n_shared in shared.most_common():
+            if n_shared < MIN_SHARED_TOKENS:
+                break
+            if not eligible(i):
+                continue
+            story = self.stories[i]
+            union = len(tokens | set(story["tokens"]))
+            if union and n_shared / union >= MIN_JACCARD and self._entities_agree(entities, tokens, story):
+                return story
+
+        return None
+
+    def record(self, articles, day=None, raw_by_link=None):
+        """
+        Replaces the stories stored for `day` (default today) with `articles`.
+        Signatures are computed from the raw scraped text in `raw_by_link` when available,
+        because that is what the next run's scrape is compared against; the tagger's
+        rewritten headline/summary would never land within a few SimHash bits of it.
+        """
+        raw_by_link = raw_by_link or {}
+        day = day or _today()
+        kept = [s for s in self.stories if s["day"] != day]
+        self._reset()
+        for story in kept:
+            self._add(story)
+
+        for art in articles:
+            raw = raw_by_link.get(art.get("link"), art)
+            self._add({
+                "day": day,
+                "simhash": simhash(raw.get("headline"), raw.get("summary")),
+                "tokens": sorted(headline_tokens(raw.get("headline"))),
+                "entities": _sorted_or_none(headline_entities(raw.get("headline"))),
+                "headline": art.get("headline"),
+                "link": art.get("link"),
+            })
+
+
+def _sorted_or_none(tokens):
+    return None if tokens is None else sorted(tokens)
+
+
+def filter_seen(articles, index=None, before_day=None):
+    """
+    Drops articles that repeat a story published on a previous day.
+    Articles that only resemble one are kept, with `possible_repeat_of` set to the
+    earlier headline so the tagger can judge whether they report something new.
+    """
+    if index is None:
+        index = StoryIndex().load()
+    if not index.stories:
+        return articles
+
+    fresh = []
+    flagged = 0
+    for art in articles:
+        if index.find_match(art, before_day) is not None:
+            continue
+        earlier = index.find_possible_repeat(art, before_day)
+        if earlier is not None:
+            art = dict(art, possible_repeat_of=earlier["headline"])
+            flagged += 1
+        fresh.append(art)
+
+    dropped = len(articles) - len(fresh)
+    metrics.incr("drops", dropped, stage="history", reason="seen_before")
+    metrics.incr("possible_repeats", flagged, stage="history")
+    print(f"Story history: dropped {dropped} previously published articles, flagged {flagged} possible repeats ({len(index.stories)} stories in the last {index.days} days).")
+    return fresh
+
+
+def load_raw_by_link(path=RAW_FEED_FILE):
+    """Maps link -> raw scraped article from the scraper's output, for signature lookup."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        raw_articles = json.load(f).get("articles", [])
+    return {art["link"]: art for art in raw_articles if art.get("link") not in (None, "N/A")}
+
+
+def record_published(articles):
+    """Adds today's final feed to the rolling index."""
+    index = StoryIndex().load()
+    index.record(articles, raw_by_link=load_raw_by_link())
+    index.save()
+    print(f"Story history: {len(articles)} stories recorded, {len(index.stories)} in the index.")
+
+
+def self_check():
+    """Regression checks for repeat detection; run with `python history.py`."""
+    yesterday = "2000-01-01"
+    index = StoryIndex(path=os.devnull)
+    index.record([
+        {"headline": "Nvidia shares fall 5% after earnings miss",
+         "summary": "Nvidia reported quarterly revenue below analyst expectations and the stock slid in extended trading.",
+         "link": "https://example.com/nvidia-earnings"},
+        {"headline": "N/A", "summary": "N/A", "link": "N/A"},
+    ], day=yesterday)
+
+    def outcome(article):
+        kept = filter_seen([article], index=index, before_day="2000-01-02")
+        if not kept:
+            return "dropped"
+        return "flagged" if "possible_repeat_of" in kept[0] else "new"
+
+    cases = [
+        # Same company/wording pattern, different company: a different story
+        ({"headline": "Apple shares fall after earnings miss", "summary": "", "link": "a"}, "new"),
+        # Follow-up on the same story: kept, but hinted for the tagger
+        ({"headline": "Nvidia CEO resigns after earnings miss, shares fall", "summary": "", "link": "b"}, "flagged"),
+        # Same article again
+        ({"headline": "Nvidia shares fall 5% after earnings miss", "summary": "", "link": "https://example.com/nvidia-earnings"}, "dropped"),
+        # Same raw text syndicated under another link
+        ({"headline": "Nvidia shares fall 5% after earnings miss",
+          "summary": "Nvidia reported quarterly revenue below analyst expectations and the stock slid in extended trading.",
+          "link": "c"}, "dropped"),
+        # No usable tokens must not match the stored N/A story
+        ({"headline": "Up 5%", "summary": "", "link": "d"}, "new"),
+    ]
+    for article, expected in cases:
+        got = outcome(article)
+        assert got == expected, f"{article['headline']!r}: expected {expected}, got {got}"
+    print(f"history self-check passed ({len(cases)} cases)")
+
+
+if __name__ == "__main__":
+    self_check()
@@ -2,6 +2,7 @@ import scraper
 import tagger
 import deduper  # <--- Import the new script
 import time
+import metrics
 
 def run_pipeline():
     print("==========================================")
@@ -11,10 +12,12 @@ def run_pipeline():
     # --- STEP 1: SCRAPING ---
     print("--- STEP 1: SCRAPING RSS FEEDS ---")
     try:
-        scraper.main()
+        with metrics.span("stage", "scrape"):
+            scraper.main()
         print(">> Scraping completed.\n")
     except Exception as e:
         print(f"!! CRITICAL ERROR IN SCRAPER: {e}")
+        metrics.export()
         return 
 
     time.sleep(1) # Short pause for file I/O safety
@@ -22,10 +25,12 @@ def run_pipeline():
     # --- STEP 2: TAGGING ---
     print("--- STEP 2: AI TAGGING & FILTERING ---")
     try:
-        tagger.tag_news_feed()
+        with metrics.span("stage", "tagging"):
+            tagger.tag_news_feed()
         print(">> Tagging completed.\n")
     except Exception as e:
         print(f"!! CRITICAL ERROR IN TAGGER: {e}")
+        metrics.export()
         return
 
     time.sleep(1)
@@ -33,15 +38,19 @@ def run_pipeline():
     # --- STEP 3: DEDUPLICATION ---
     print("--- STEP 3: SEMANTIC DEDUPLICATION ---")
     try:
-        deduper.deduplicate_feed()
+        with metrics.span("stage", "dedup"):
+            deduper.deduplicate_feed()
         print(">> Deduplication completed.\n")
     except Exception as e:
         print(f"!! CRITICAL ERROR IN DEDUPER: {e}")
+        metrics.export()
         return
 
     print("==========================================")
     print("       PIPELINE FINISHED SUCCESSFULLY     ")
     print("==========================================")
 
+    metrics.export()
+
 if __name__ == "__main__":
     run_pipeline()
\ No newline at end of file
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import threading
+
+# --- CONFIG ---
+# Instrumentation is OFF unless PIPELINE_METRICS is set (e.g. PIPELINE_METRICS=1).
+# When off, incr() returns immediately and span() only reads the clock (so callers can
+# still print its duration) without recording anything.
+METRICS_ENV = "PIPELINE_METRICS"
+METRICS_FILE = 'metrics.prom'
+TRACE_FILE = 'trace.jsonl'
+METRIC_PREFIX = 'pipeline'
+
+_enabled = os.getenv(METRICS_ENV, "").lower() not in ("", "0", "false", "no")
+_lock = threading.Lock()
+_counters = {}      # (name, labels) -> value
+_span_totals = {}   # (kind, name) -> [count, total_seconds]
+_finished_spans = []
+
+
+def enable(on=True):
+    """Turns instrumentation on or off for the current process."""
+    global _enabled
+    _enabled = on
+
+
+def is_enabled():
+    return _enabled
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Span:
+    """Times one unit of work (stage, feed, batch or user) and records it on exit."""
+
+    def __init__(self, kind, name, attrs, enabled):
+        self.kind = kind
+        self.name = name
+        self.attrs = attrs
+        self.enabled = enabled
+        self.start = None
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        if self.enabled:
+            self.wall_start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if not self.enabled:
+            return False
+        record = {
+            "kind": self.kind,
+            "name": self.name,
+            "start": round(self.wall_start, 6),
+            "duration_s": round(self.duration, 6),
+            "status": "error" if exc_type else "ok",
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        with _lock:
+            totals = _span_totals.setdefault((self.kind, self.name), [0, 0.0])
+            totals[0] += 1
+            totals[1] += self.duration
+            _finished_spans.append(record)
+        return False
+
+
+def span(kind, name, **attrs):
+    """
+    Context manager timing a unit of work, e.g.
+        with metrics.span("batch", "tagging", batch=3) as batch_span: ...
+    `batch_span.duration` is available after the block even when metrics are disabled.
+    """
+    return _Span(kind, name, attrs, _enabled)
+
+
+def incr(name, value=1, **labels):
+    """Adds `value` to the counter `name` (articles_in, drops, parse_failures, cache_hits...)."""
+    if not _enabled:
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def record_usage(message, **labels):
+    """Counts LLM tokens from an Anthropic response's `message.usage`."""
+    if not _enabled:
+        return
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return
+    incr("llm_input_tokens", getattr(usage, "input_tokens", 0) or 0, **labels)
+    incr("llm_output_tokens", getattr(usage, "output_tokens", 0) or 0, **labels)
+    incr("llm_requests", **labels)
+
+
+def _escape_label_value(value):
+    """Escapes backslashes, quotes and newlines as the exposition format requires."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def render_prometheus():
+    """Returns all counters and span totals in Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+        span_totals = {k: list(v) for k, v in _span_totals.items()}
+
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+        metric = f"{METRIC_PREFIX}_{name}_total"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    if span_totals:
+        metric = f"{METRIC_PREFIX}_span_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for (kind, name), (count, total) in sorted(span_totals.items()):
+            labels = _format_labels((("kind", kind), ("name", name)))
+            lines.append(f"{metric}_sum{labels} {total:.6f}")
+            lines.append(f"{metric}_count{labels} {count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def export(metrics_file=METRICS_FILE, trace_file=TRACE_FILE):
+    """
+    Writes the Prometheus snapshot and appends finished spans to the JSONL trace.
+    Does nothing when instrumentation is disabled.
+    """
+    if not _enabled:
+        return
+
+    with open(metrics_file, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+
+    with _lock:
+        spans = list(_finished_spans)
+        _finished_spans.clear()
+
+    with open(trace_file, 'a', encoding='utf-8') as f:
+        for record in spans:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    print(f"Metrics written to '{metrics_file}', {len(spans)} spans appended to '{trace_file}'")
+
+
+def reset():
+    """Clears all collected counters and spans."""
+    with _lock:
+        _counters.clear()
+        _span_totals.clear()
+        _finished_spans.clear()
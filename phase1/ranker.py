@@ -0,0 +1,184 @@
+import re
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from dateutil import parser as date_parser
+from scraper import TZ_MAPPING
+
+# --- CONFIG: Scoring Weights ---
+# Multipliers applied on top of the base score. Anything not listed counts as 1.0.
+SOURCE_WEIGHTS = {
+    "CNBC": 1.0,
+    "TechCrunch": 1.0,
+    "Verge": 0.9,
+    "ESPN": 0.9,
+    "Yahoo Sports": 0.8,
+    "BBC Sport": 0.9,
+}
+
+CATEGORY_WEIGHTS = {
+    "Top News": 1.3,
+    "Top Headlines": 1.3,
+    "Top Stories": 1.3,
+    "World News": 1.2,
+    "Economy": 1.2,
+    "Politics": 1.2,
+    "Commentary": 0.5,
+    "Reviews": 0.4,
+    "Travel": 0.7,
+    "Wealth": 0.7,
+}
+
+RECENCY_HALF_LIFE_HOURS = 8      # a story loses half its recency score every 8h
+COVERAGE_BONUS = 0.5             # added per additional source covering the same story
+COVERAGE_MIN_SHARED = 3          # headline tokens two stories must share to count as the same
+COVERAGE_MIN_OVERLAP = 0.5       # ...and the share of the shorter headline they must cover
+COMMON_TOKEN_LIMIT = 50          # ignore tokens appearing in more headlines than this
+
+# Headline features: low-value formats are penalised, hard-news verbs are boosted
+LOW_VALUE_PATTERNS = re.compile(
+    r"\b(top \d+|\d+ (best|ways|things|reasons)|best .* (deals?|of)|review|hands-on|how to|"
+    r"deals?|quiz|podcast|newsletter|watch:|opinion|recap)\b",
+    re.IGNORECASE,
+)
+HIGH_VALUE_PATTERNS = re.compile(
+    r"\b(acquires?|acquisition|merger|buys|launch(es|ed)?|recalls?|sanctions?|bans?|sues|lawsuit|"
+    r"ruling|rates?|tariffs?|earnings|layoffs?|resigns?|elected|dies|killed|strike|breach|"
+    r"raises|ipo|approves?|record)\b",
+    re.IGNORECASE,
+)
+
+STOPWORDS = {
+    "the", "and", "for", "with", "from", "that", "this", "after", "over", "into", "about",
+    "says", "said", "will", "have", "has", "its", "their", "what", "when", "how", "why",
+    "new", "more", "than", "are", "was", "were", "been", "not", "but", "his", "her", "out",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9$%]+")
+
+
+def headline_tokens(headline):
+    """Lowercased, stopword-free tokens used to spot the same story across sources."""
+    tokens = TOKEN_PATTERN.findall((headline or "").lower())
+    return {t for t in tokens if len(t) > 2 and t not in STOPWORDS}
+
+
+def recency_score(date_str, now):
+    """Exponential decay on article age. Unparseable dates get a neutral middle score."""
+    try:
+        pub_date = date_parser.parse(date_str, tzinfos=TZ_MAPPING)
+        if pub_date.tzinfo is None:
+            pub_date = pub_date.replace(tzinfo=timezone.utc)
+    except Exception:
+        return 0.5
+
+    age_hours = max(0.0, (now - pub_date).total_seconds() / 3600)
+    return 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+
+def headline_score(headline):
+    """Small bonus/penalty based on the wording of the headline."""
+    headline = headline or ""
+    score = 1.0
+    if LOW_VALUE_PATTERNS.search(headline):
+        score -= 0.5
+    if HIGH_VALUE_PATTERNS.search(headline):
+        score += 0.3
+    if headline.rstrip().endswith("?"):
+        score -= 0.2
+    if headline == "N/A":
+        score -= 0.5
+    return max(score, 0.1)
+
+
+def coverage_counts(articles, token_sets):
+    """
+    For each article, counts how many OTHER sources carry a story with a matching headline.
+    Uses an inverted index over headline tokens so it stays fast on a few thousand articles.
+    """
+    index = defaultdict(list)
+    for i, tokens in enumerate(token_sets):
+        for token in tokens:
+            index[token].append(i)
+
+    counts = []
+    for i, tokens in enumerate(token_sets):
+        shared = Counter()
+        for token in tokens:
+            postings = index[token]
+            if len(postings) > COMMON_TOKEN_LIMIT:
+                continue
+            shared.update(postings)
+
+        own_source = articles[i].get("source")
+        other_sources = set()
+        for j, n_shared in shared.items():
+            if j == i or n_shared < COVERAGE_MIN_SHARED:
+                continue
+            if articles[j].get("source") == own_source:
+                continue
+            shorter = min(len(tokens), len(token_sets[j]))
+            if shorter and n_shared / shorter >= COVERAGE_MIN_OVERLAP:
+                other_sources.add(articles[j].get("source"))
+        counts.append(len(other_sources))
+
+    return counts
+
+
+def score_articles(articles, now=None):
+    """Returns a list of scores, one per article, in the same order."""
+    now = now or datetime.now(timezone.utc)
+    token_sets = [headline_tokens(art.get("headline")) for art in articles]
+    coverage = coverage_counts(articles, token_sets)
+
+    scores = []
+    for art, n_other in zip(articles, coverage):
+        score = (
+            recency_score(art.get("date", ""), now)
+            + headline_score(art.get("headline"))
+            + COVERAGE_BONUS * n_other
+        )
+        score *= SOURCE_WEIGHTS.get(art.get("source"), 1.0)
+        score *= CATEGORY_WEIGHTS.get(art.get("category"), 1.0)
+        scores.append(score)
+
+    return scores
+
+
+def rank_articles(articles, limit, now=None):
+    """
+    Picks up to `limit` articles for the LLM.
+    Articles are scored locally, repeated links are collapsed, then the budget is filled
+    round-robin across sources (best remaining article from each source per round) so no
+    source is starved just because it comes later in sources.json.
+    """
+    scores = score_articles(articles, now)
+
+    # Same link listed under several categories: keep only its best-scoring copy
+    best_by_link = {}
+    for i, art in enumerate(articles):
+        key = art.get("link") or f"#{i}"
+        if key == "N/A":
+            key = f"#{i}"
+        if key not in best_by_link or scores[i] > scores[best_by_link[key]]:
+            best_by_link[key] = i
+
+    by_source = defaultdict(list)
+    for i in best_by_link.values():
+        by_source[articles[i].get("source")].append(i)
+    for indices in by_source.values():
+        indices.sort(key=lambda i: scores[i], reverse=True)
+
+    # Sources whose best article scores highest get first pick in every round
+    queues = sorted(by_source.values(), key=lambda idx: scores[idx[0]], reverse=True)
+
+    selected = []
+    depth = 0
+    while len(selected) < limit and queues:
+        queues = [q for q in queues if depth < len(q)]
+        for q in queues:
+            if len(selected) >= limit:
+                break
+            selected.append(q[depth])
+        depth += 1
+
+    return [articles[i] for i in selected]
@@ -1,64 +1,83 @@
 from bs4 import BeautifulSoup
+import os
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from dateutil import parser as date_parser
 from dateutil import tz
+import metrics
 
 # Configuration
 SOURCES_FILE = 'sources.json'
 OUTPUT_FILE = 'news_feed.json'
 
-def parse_feed(url, tags, site_name, category_name):
-    """Fetches a single RSS URL and returns a list of article objects."""
-    articles = []
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
-    # Define timezone mapping for ambiguous abbreviations
-    tz_mapping = {
-        "EST": tz.gettz("US/Eastern"),
-        "EDT": tz.gettz("US/Eastern"),
-        "CST": tz.gettz("US/Central"),
-        "CDT": tz.gettz("US/Central"),
-        "MST": tz.gettz("US/Mountain"),
-        "MDT": tz.gettz("US/Mountain"),
-        "PST": tz.gettz("US/Pacific"),
-        "PDT": tz.gettz("US/Pacific")
-    }
-
-    # Define the cutoff time (24 hours ago), ensuring it is timezone-aware (UTC)
-    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, features='xml')
-        items = soup.find_all(tags['article']) 
-
-        for item in items:
+# Parsing is CPU-bound; set SCRAPER_PARSE_WORKERS=N to download feeds on a thread pool
+# and hand each response to N parsing processes as soon as it arrives.
+# 0 keeps the original one-feed-at-a-time loop.
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "0"))
+FETCH_WORKERS = 16
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Define timezone mapping for ambiguous abbreviations
+TZ_MAPPING = {
+    "EST": tz.gettz("US/Eastern"),
+    "EDT": tz.gettz("US/Eastern"),
+    "CST": tz.gettz("US/Central"),
+    "CDT": tz.gettz("US/Central"),
+    "MST": tz.gettz("US/Mountain"),
+    "MDT": tz.gettz("US/Mountain"),
+    "PST": tz.gettz("US/Pacific"),
+    "PDT": tz.gettz("US/Pacific")
+}
+
+def fetch_feed(url):
+    """Downloads a single RSS URL and returns the raw response bytes."""
+    response = requests.get(url, headers=HEADERS, timeout=10)
+    response.raise_for_status()
+    return response.content
+
+def parse_feed_content(content, tags, cutoff_ts):
+    """
+    Parses raw RSS bytes into compact (headline, date, summary, link) tuples.
+    Runs in worker processes, so it only takes and returns plain picklable values.
+    Returns (rows, too_old, bad_dates, bad_items) so the caller can record the counters.
+    """
+    rows = []
+    too_old = 0
+    bad_dates = 0
+    bad_items = 0
+    cutoff_time = datetime.fromtimestamp(cutoff_ts, timezone.utc)
+
+    soup = BeautifulSoup(content, features='xml')
+    items = soup.find_all(tags['article'])
+
+    for item in items:
+        try:
             # 1. Extract Date first to filter immediately
             date_node = item.find(tags['date'])
             date_str = date_node.text.strip() if date_node else str(datetime.now())
-            
+
             try:
                 # Parse the date string into a datetime object
                 # UPDATED: Pass tzinfos to fix the EST warning
-                pub_date = date_parser.parse(date_str, tzinfos=tz_mapping)
-                
+                pub_date = date_parser.parse(date_str, tzinfos=TZ_MAPPING)
+
                 # If the date has no timezone (naive), assume UTC to compare safely
                 if pub_date.tzinfo is None:
                     pub_date = pub_date.replace(tzinfo=timezone.utc)
-                
+
                 # DISCARD if older than 24 hours
                 if pub_date < cutoff_time:
-                    continue 
+                    too_old += 1
+                    continue
 
             except Exception:
                 # If date parsing fails, we assume it's new enough to keep
-                pass
+                bad_dates += 1
 
             # 2. Title
             title_node = item.find(tags['title'])
@@ -69,7 +88,7 @@ def parse_feed(url, tags, site_name, category_name):
             link = "N/A"
             if link_node:
                 link = link_node.text.strip()
-                if tags.get('link_attr'): 
+                if tags.get('link_attr'):
                     link = link_node.get(tags['link_attr'])
 
             # 4. Summary
@@ -82,44 +101,152 @@ def parse_feed(url, tags, site_name, category_name):
                 else:
                     summary = raw_text.strip()[:300]
 
-            articles.append({
-                "source": site_name,
-                "category": category_name,
-                "headline": title,
-                "date": date_str,
-                "summary": summary,
-                "link": link
-            })
-            
+            rows.append((title, date_str, summary, link))
+
+        except Exception:
+            # One malformed item shouldn't cost us the rest of the feed
+            bad_items += 1
+
+    return rows, too_old, bad_dates, bad_items
+
+def rows_to_articles(rows, too_old, bad_dates, bad_items, site_name, category_name):
+    """Expands compact parse results back into article objects and records counters."""
+    metrics.incr("drops", too_old, stage="scrape", reason="too_old")
+    metrics.incr("parse_failures", bad_dates, stage="scrape", field="date")
+    metrics.incr("parse_failures", bad_items, stage="scrape", field="item")
+    return [
+        {
+            "source": site_name,
+            "category": category_name,
+            "headline": title,
+            "date": date_str,
+            "summary": summary,
+            "link": link
+        }
+        for title, date_str, summary, link in rows
+    ]
+
+def cutoff_timestamp():
+    # Define the cutoff time (24 hours ago), ensuring it is timezone-aware (UTC)
+    return (datetime.now(timezone.utc) - timedelta(hours=24)).timestamp()
+
+def parse_feed(url, tags, site_name, category_name):
+    """Fetches a single RSS URL and returns a list of article objects."""
+    try:
+        content = fetch_feed(url)
+        rows, too_old, bad_dates, bad_items = parse_feed_content(content, tags, cutoff_timestamp())
+        return rows_to_articles(rows, too_old, bad_dates, bad_items, site_name, category_name)
     except Exception as e:
+        metrics.incr("parse_failures", stage="scrape", field="feed")
         print(f"Error reading {url}: {e}")
+        return []
 
-    return articles
-
-def process_feeds():
+def list_feeds(sources):
+    """Flattens sources.json into (site_name, category, url, tags) tuples, in file order."""
+    feeds = []
+    for site_name, site_info in sources.items():
+        tags = site_info.get("tags")
+        for category, url in site_info.get("categories", {}).items():
+            feeds.append((site_name, category, url, tags))
+    return feeds
+
+def parse_contents_parallel(contents, feeds, parse_workers, cutoff_ts=None):
+    """
+    Parses already-downloaded feed bytes in a process pool.
+    `contents` lines up with `feeds`; entries that are None (failed downloads) are skipped.
+    Returns one list of articles per feed, in the same order.
+    """
+    if cutoff_ts is None:
+        cutoff_ts = cutoff_timestamp()
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        futures = {}
+        for i, content in enumerate(contents):
+            if content is not None:
+                futures[i] = pool.submit(parse_feed_content, content, feeds[i][3], cutoff_ts)
+        return collect_parsed(futures, feeds)
+
+def collect_parsed(parse_futures, feeds):
+    """Turns {feed index: parse future} into one list of articles per feed, in feed order."""
+    results = [[] for _ in feeds]
+    for i in sorted(parse_futures):
+        site_name, category, url, _ = feeds[i]
+        try:
+            rows, too_old, bad_dates, bad_items = parse_futures[i].result()
+            results[i] = rows_to_articles(rows, too_old, bad_dates, bad_items, site_name, category)
+        except Exception as e:
+            metrics.incr("parse_failures", stage="scrape", field="feed")
+            print(f"Error reading {url}: {e}")
+    return results
+
+def fetch_logged(feed):
+    """Downloads one (site_name, category, url, tags) feed; failures are reported and return None."""
+    site_name, category, url, _ = feed
+    try:
+        with metrics.span("feed", f"{site_name}/{category}"):
+            return fetch_feed(url)
+    except Exception as e:
+        metrics.incr("parse_failures", stage="scrape", field="feed")
+        print(f"Error reading {url}: {e}")
+        return None
+
+def fetch_all(feeds):
+    """Downloads every feed concurrently. Failed downloads come back as None."""
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        return list(pool.map(fetch_logged, feeds))
+
+def fetch_and_parse_parallel(feeds, parse_workers):
+    """
+    Downloads feeds on a thread pool and submits each response to the process pool
+    as soon as it arrives, so one slow feed doesn't hold back parsing of the others.
+    Returns one list of articles per feed, in the same order as `feeds`.
+    """
+    cutoff_ts = cutoff_timestamp()
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=FETCH_WORKERS) as fetch_pool:
+        fetch_futures = {fetch_pool.submit(fetch_logged, feed): i for i, feed in enumerate(feeds)}
+        parse_futures = {}
+        for future in as_completed(fetch_futures):
+            i = fetch_futures[future]
+            content = future.result()
+            if content is not None:
+                parse_futures[i] = parse_pool.submit(parse_feed_content, content, feeds[i][3], cutoff_ts)
+        return collect_parsed(parse_futures, feeds)
+
+def process_feeds(parse_workers=PARSE_WORKERS):
     """Main logic: reads sources, loops through them, saves output."""
     with open(SOURCES_FILE, 'r') as f:
         sources = json.load(f)
 
+    feeds = list_feeds(sources)
     all_articles = []
 
-    for site_name, site_info in sources.items():
-        print(f"--- Processing: {site_name} ---")
-        tags = site_info.get("tags")
-        
-        for category, url in site_info.get("categories", {}).items():
+    if parse_workers > 0:
+        print(f"--- Fetching {len(feeds)} feeds, parsing with {parse_workers} processes ---")
+        for new_articles in fetch_and_parse_parallel(feeds, parse_workers):
+            all_articles.extend(new_articles)
+    else:
+        current_site = None
+        for site_name, category, url, tags in feeds:
+            if site_name != current_site:
+                print(f"--- Processing: {site_name} ---")
+                current_site = site_name
             print(f"   Fetching: {category}")
-            new_articles = parse_feed(url, tags, site_name, category)
+            with metrics.span("feed", f"{site_name}/{category}"):
+                new_articles = parse_feed(url, tags, site_name, category)
             all_articles.extend(new_articles)
 
+    metrics.incr("articles_out", len(all_articles), stage="scrape")
+
     # Save
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump({"articles": all_articles}, f, indent=4, ensure_ascii=False)
-    
+
     print(f"\nSuccess! {len(all_articles)} articles (from last 24h) saved to '{OUTPUT_FILE}'")
 
 def main():
     process_feeds()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
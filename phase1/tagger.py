@@ -2,8 +2,10 @@ import os
 import json
 import anthropic
 import re
-import time
 from dotenv import load_dotenv, find_dotenv
+import metrics
+import ranker
+import history
 
 # 1. Load Environment Variables
 load_dotenv(find_dotenv())
@@ -31,6 +33,7 @@ You are an advanced news aggregation AI. Your goal is to curate a high-signal ne
    - "Top 10" lists, buying guides, or reviews.
    - Minor incremental updates (e.g., "Game server maintenance").
    - Opinion pieces, editorials, or advice columns.
+   - Articles with a `possible_repeat_of` field (a headline we already published in the last few days) that do not report a significant NEW development beyond that earlier story.
 
    **Clean**: 
    - Rewrite headlines to be purely factual (remove clickbait like "You won't believe...").
@@ -105,35 +108,35 @@ def process_batch(batch_articles, batch_index):
     batch_input = json.dumps({"articles": batch_articles}, indent=2)
     
     print(f"   > Processing batch {batch_index} ({len(batch_articles)} articles)...")
-    batch_start_time = time.time()  # <--- Start Batch Timer
     
     try:
-        message = client.messages.create(
-            model="claude-3-haiku-20240307", # Note: Updated to correct model ID format if needed
-            max_tokens=4000,
-            temperature=0,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"### INPUT DATA\n{batch_input}"
-                }
-            ]
-        )
-        
-        response_text = message.content[0].text
-        
-        # Clean and Parse
-        clean_json = extract_json_from_text(response_text)
-        data = json.loads(clean_json)
+        with metrics.span("batch", "tagging", batch=batch_index, size=len(batch_articles)) as batch_span:
+            message = client.messages.create(
+                model="claude-3-haiku-20240307", # Note: Updated to correct model ID format if needed
+                max_tokens=4000,
+                temperature=0,
+                system=SYSTEM_PROMPT,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": f"### INPUT DATA\n{batch_input}"
+                    }
+                ]
+            )
+            
+            metrics.record_usage(message, stage="tagging")
+            response_text = message.content[0].text
+            
+            # Clean and Parse
+            clean_json = extract_json_from_text(response_text)
+            data = json.loads(clean_json)
         
-        batch_end_time = time.time()  # <--- End Batch Timer
-        duration = batch_end_time - batch_start_time
-        print(f"     -> Batch {batch_index} finished in {duration:.2f} seconds.") # <--- Print Duration
+        print(f"     -> Batch {batch_index} finished in {batch_span.duration:.2f} seconds.")
         
         return data.get("articles", [])
 
     except json.JSONDecodeError:
+        metrics.incr("parse_failures", stage="tagging", field="response")
         print(f"   !!! JSON Error in batch {batch_index}. Skipping this batch.")
         return []
     except Exception as e:
@@ -156,12 +159,19 @@ def tag_news_feed():
         raw_data = json.load(f)
     
     all_raw_articles = raw_data.get("articles", [])
+    metrics.incr("articles_in", len(all_raw_articles), stage="tagging")
+
+    # --- HISTORY: skip stories already published in the last few days ---
+    with metrics.span("stage", "history"):
+        all_raw_articles = history.filter_seen(all_raw_articles)
     total_found = len(all_raw_articles)
     
     # --- LIMIT LOGIC ---
     if MAX_ARTICLES_LIMIT and total_found > MAX_ARTICLES_LIMIT:
-        print(f"Limiting input from {total_found} to {MAX_ARTICLES_LIMIT} articles.")
-        all_raw_articles = all_raw_articles[:MAX_ARTICLES_LIMIT]
+        print(f"Ranking {total_found} articles and keeping the top {MAX_ARTICLES_LIMIT}.")
+        with metrics.span("stage", "ranking"):
+            all_raw_articles = ranker.rank_articles(all_raw_articles, MAX_ARTICLES_LIMIT)
+        metrics.incr("drops", total_found - len(all_raw_articles), stage="tagging", reason="limit")
     else:
         print(f"Processing all {total_found} articles.")
     
@@ -169,26 +179,23 @@ def tag_news_feed():
     BATCH_SIZE = 20
     final_tagged_list = []
     
-    # Start Total Timer
-    total_start_time = time.time() # <--- Start Total Timer
-    
-    # Loop through list in chunks of BATCH_SIZE
-    for i in range(0, len(all_raw_articles), BATCH_SIZE):
-        batch = all_raw_articles[i : i + BATCH_SIZE]
-        batch_num = (i // BATCH_SIZE) + 1
-        
-        # Send to AI
-        tagged_batch = process_batch(batch, batch_num)
-        
-        # Accumulate results
-        if tagged_batch:
-            final_tagged_list.extend(tagged_batch)
-
-    # End Total Timer
-    total_end_time = time.time() # <--- End Total Timer
-    total_duration = total_end_time - total_start_time
+    with metrics.span("stage", "tagging_batches") as batches_span:
+        # Loop through list in chunks of BATCH_SIZE
+        for i in range(0, len(all_raw_articles), BATCH_SIZE):
+            batch = all_raw_articles[i : i + BATCH_SIZE]
+            batch_num = (i // BATCH_SIZE) + 1
+            
+            # Send to AI
+            tagged_batch = process_batch(batch, batch_num)
+            
+            # Accumulate results
+            if tagged_batch:
+                final_tagged_list.extend(tagged_batch)
 
     # --- POST-PROCESSING ---
+    metrics.incr("drops", max(0, len(all_raw_articles) - len(final_tagged_list)), stage="tagging", reason="filtered")
+    metrics.incr("articles_out", len(final_tagged_list), stage="tagging")
+
     print("Assigning IDs and saving...")
     for index, article in enumerate(final_tagged_list, 1):
         article['id'] = index
@@ -200,9 +207,9 @@ def tag_news_feed():
     print(f"Success! {len(final_tagged_list)} articles saved to '{output_file}'")
     
     # Print formatted total time
-    minutes = int(total_duration // 60)
-    seconds = int(total_duration % 60)
-    print(f"Total processing time: {minutes}m {seconds}s") # <--- Print Total Duration
+    minutes = int(batches_span.duration // 60)
+    seconds = int(batches_span.duration % 60)
+    print(f"Total processing time: {minutes}m {seconds}s")
 
 if __name__ == "__main__":
     tag_news_feed()
\ No newline at end of file
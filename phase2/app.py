@@ -1,20 +1,48 @@
 import streamlit as st
-import pandas as pd
 import user_manager
-import generator # The new script above
 
 st.set_page_config(page_title="The Daily Distill", layout="wide")
 
+# --- CACHED LOADERS ---
+# Streamlit re-executes this script on every interaction, so anything expensive
+# (the generator/anthropic import, DB reads) is cached and cleared explicitly on writes.
+@st.cache_resource
+def load_generator():
+    """Imports the generator and builds its Anthropic client once per server process."""
+    import generator
+    generator.get_client()
+    return generator
+
+# The TTL picks up writes made outside the app (e.g. generator run from the CLI)
+USER_CACHE_TTL = 30
+
+@st.cache_data(ttl=USER_CACHE_TTL)
+def load_user_emails():
+    # Errors propagate so a missing table is not cached as an empty user list
+    conn = user_manager.get_db_connection()
+    try:
+        return [row['email'] for row in conn.execute("SELECT email FROM users")]
+    finally:
+        conn.close()
+
+@st.cache_data(ttl=USER_CACHE_TTL)
+def load_user(email):
+    conn = user_manager.get_db_connection()
+    user = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+    conn.close()
+    return dict(user) if user else None
+
+def refresh_users():
+    """Drops cached user data after add_user / save_newsletter."""
+    load_user_emails.clear()
+    load_user.clear()
+
 # Sidebar
 st.sidebar.title("Admin Panel")
-conn = user_manager.get_db_connection()
 try:
-    # Load users to populate dropdown
-    users = pd.read_sql("SELECT * FROM users", conn)
-    user_list = users['email'].tolist()
-except:
+    user_list = load_user_emails()
+except Exception:
     user_list = []
-conn.close()
 
 choice = st.sidebar.selectbox("Select User", ["Create New User"] + user_list)
 
@@ -29,14 +57,13 @@ if choice == "Create New User":
         
         if st.form_submit_button("Save Profile"):
             user_manager.add_user(email, first, last, prefs)
+            refresh_users()
             st.success("User added! Refresh to see them in the list.")
 
 # --- VIEW / GENERATE ---
 else:
     # Get user data
-    conn = user_manager.get_db_connection()
-    user = conn.execute("SELECT * FROM users WHERE email = ?", (choice,)).fetchone()
-    conn.close()
+    user = load_user(choice)
     
     st.title(f"Newsletter for {user['first_name']} {user['last_name']}")
     
@@ -47,13 +74,15 @@ else:
         new_prefs = st.text_area("Update Preferences", value=user['preferences'], height=150)
         if st.button("Update Preferences"):
             user_manager.add_user(user['email'], user['first_name'], user['last_name'], new_prefs)
+            refresh_users()
             st.toast("Updated!")
             
     with tab2:
         # The "Go" Button
         if st.button("🚀 Generate Newsletter (Run Pipeline)"):
             with st.spinner("Filtering > Researching > Writing..."):
-                generator.generate_for_user(user['user_id'])
+                load_generator().generate_for_user(user['user_id'])
+                refresh_users()
                 st.success("Newsletter Generated!")
                 st.rerun()
         
@@ -1,16 +1,41 @@
 import os
 import json
-import sqlite3
-import anthropic
-from dotenv import load_dotenv, find_dotenv
 import user_manager 
-
-load_dotenv(find_dotenv())
-client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+import pipeline_metrics as metrics
 
 PHASE1_DIR = os.path.join(os.path.dirname(__file__), '..', 'phase1')
 MASTER_FEED_PATH = os.path.join(PHASE1_DIR, 'master_feed.json')
 
+# Built on first use so importing this module stays cheap (anthropic is a heavy import)
+_client = None
+_feed_cache = {"mtime": None, "feed": None}
+
+def get_client():
+    """Returns the shared Anthropic client, creating it on the first call."""
+    global _client
+    if _client is None:
+        import anthropic
+        from dotenv import load_dotenv, find_dotenv
+
+        load_dotenv(find_dotenv())
+        _client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    return _client
+
+def load_feed():
+    """Returns the master feed, only re-reading the file when Phase 1 has rewritten it."""
+    if not os.path.exists(MASTER_FEED_PATH):
+        return None
+
+    mtime = os.path.getmtime(MASTER_FEED_PATH)
+    if _feed_cache["mtime"] == mtime:
+        metrics.incr("cache_hits", cache="feed")
+        return _feed_cache["feed"]
+
+    with open(MASTER_FEED_PATH, 'r') as f:
+        _feed_cache["feed"] = json.load(f)
+    _feed_cache["mtime"] = mtime
+    return _feed_cache["feed"]
+
 # --- STEP A: FILTER (Matchmaker) ---
 def filter_news(preferences, all_articles):
     """Returns a list of articles relevant to the user."""
@@ -18,12 +43,14 @@ def filter_news(preferences, all_articles):
     
     user_content = f"PREFERENCES: {preferences}\n\nARTICLES: {json.dumps(all_articles)}"
     
-    message = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=2000,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_content}]
-    )
+    with metrics.span("batch", "filter", size=len(all_articles)):
+        message = get_client().messages.create(
+            model="claude-haiku-4-5-20251001",
+            max_tokens=2000,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_content}]
+        )
+    metrics.record_usage(message, stage="filter")
     return message.content[0].text
 
 # --- STEP C: WRITER (Haiku) ---
@@ -79,12 +106,14 @@ def write_newsletter(articles_text, user_name):
     - **Visuals**: Use standard Markdown. No colored text or code blocks.
     """
     
-    message = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=3000, # Increased for longer output
-        system=system_prompt,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    with metrics.span("batch", "write"):
+        message = get_client().messages.create(
+            model="claude-haiku-4-5-20251001",
+            max_tokens=3000, # Increased for longer output
+            system=system_prompt,
+            messages=[{"role": "user", "content": prompt}]
+        )
+    metrics.record_usage(message, stage="write")
     
     raw_text = message.content[0].text
     
@@ -104,22 +133,22 @@ def generate_for_user(user_id):
     if not user: return "User not found."
 
     # 2. Get News Data
-    if not os.path.exists(MASTER_FEED_PATH):
+    feed = load_feed()
+    if feed is None:
         return "Error: master_feed.json not found. Run Phase 1."
-
-    with open(MASTER_FEED_PATH, 'r') as f:
-        feed = json.load(f)
     
     print(f"--- Pipeline Started for {user['first_name']} ---")
-    
-
-    print("1. Filtering News...")
-    relevant_content = filter_news(user['preferences'], feed['articles'])
-    
-    print("2. Writing Newsletter...")
-    final_email = write_newsletter(relevant_content, user['first_name'])
-    
-    user_manager.save_newsletter(user_id, final_email)
+    metrics.incr("articles_in", len(feed['articles']), stage="generate")
+
+    with metrics.span("user", user_id):
+        print("1. Filtering News...")
+        relevant_content = filter_news(user['preferences'], feed['articles'])
+        
+        print("2. Writing Newsletter...")
+        final_email = write_newsletter(relevant_content, user['first_name'])
+        
+        user_manager.save_newsletter(user_id, final_email)
     print(">> Done! Newsletter saved to Database.")
+    metrics.export()
     
     return final_email